@@ -7,6 +7,11 @@ from .lib import MineClicker
 import sys
 
 
+# answers understood by check_yes, after stripping and case folding
+YES_ANSWERS = frozenset({"yes", "y"})
+NO_ANSWERS = frozenset({"no", "n"})
+
+
 def check_yes(user_string):
     """
     A function to test user meaning when they are asked to return a
@@ -14,16 +19,19 @@ def check_yes(user_string):
     Paramaters
     ----------
     user_string : string
-        The user input, hopefully something like "yes" or "no"
+        The user input, hopefully something like "yes" or "no" (in any case)
     Returns
     -------
     boolean
         True for "yes" style answers and False for "no" style answers
+    None
+        Returns None if the answer is not understood
     """
-    answers = {"Yes": True, "yes": True, "Y": True, "y": True,
-               "No": False, "no": False, "N": False, "n": False}
-    if user_string in answers:
-        return answers[user_string]
+    answer = user_string.strip().casefold()
+    if answer in YES_ANSWERS:
+        return True
+    elif answer in NO_ANSWERS:
+        return False
     else:
         return None
 
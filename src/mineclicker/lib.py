@@ -6,12 +6,73 @@ from mineclicker.lib import MineClicker
 game = MineClicker()
 game.flag_tile((2,2))
 etc.
+
+The class doesn't need numpy, but the gameboards it returns can be turned
+into numpy arrays with to_numpy().
 """
 
-import numpy as np
+import math
+import operator
 import random as rand
 
 
+# a bitboard with every one of the 64 tiles on the board set
+FULL_BOARD = 0xFFFFFFFFFFFFFFFF
+# bitboards with every tile set apart from the first (NOT_A) or last (NOT_H)
+# column, used to stop shifted tiles wrapping around onto the next row
+NOT_A = 0xFEFEFEFEFEFEFEFE
+NOT_H = 0x7F7F7F7F7F7F7F7F
+
+
+def adjacent_tiles(bitboard):
+    """
+    Return every tile adjacent (including diagonals) to the tiles set in a
+    bitboard. Shifting by 1 moves a tile along a column and shifting by 8
+    moves it along a row, so the 8 shifts cover all the neighbours of every
+    set tile at once.
+    Paramaters.
+    ----------
+    bitboard : int
+        A bitboard of tiles on the gameboard
+    Returns
+    -------
+    int
+        A bitboard of the tiles adjacent to the set tiles
+    """
+    adjacent = (((bitboard << 1) & NOT_A) |
+                ((bitboard >> 1) & NOT_H) |
+                (bitboard << 8) |
+                (bitboard >> 8) |
+                ((bitboard << 9) & NOT_A) |
+                ((bitboard << 7) & NOT_H) |
+                ((bitboard >> 7) & NOT_A) |
+                ((bitboard >> 9) & NOT_H))
+    return adjacent & FULL_BOARD
+
+
+# the board is always 8 by 8, so the neighbours of each tile (indexed by bit
+# number row*8 + col) can be looked up instead of worked out every time
+NEIGHBOURS = tuple(adjacent_tiles(1 << tile) for tile in range(64))
+
+
+def to_numpy(grid):
+    """
+    Convert a gameboard, like MineClicker.grid or the result of
+    MineClicker.player_view(), into a numpy array. numpy is only imported
+    when this is called.
+    Paramaters.
+    ----------
+    grid : list of lists
+        A gameboard as a list of rows
+    Returns
+    -------
+    numpy.ndarray
+        The gameboard as an array accessed [row, col]
+    """
+    import numpy as np
+    return np.array(grid)
+
+
 class MineClicker:
     """
     A class for a minesweeper style gameboard.
@@ -19,12 +80,15 @@ class MineClicker:
         instance = MineClicker(args)
     Attributes
     ----------
-        grid : numpy.ndarray
-            The state of the gameboard
-        swept : numpy.ndarray
-            Where the user has swept a tile
-        flagged : numpy.ndarray
-            Where user has flagged a tile
+        mines : int
+            A bitboard of where the mines are, tile (row, col) is bit
+            row*8 + col. Setting it updates the adjacent mine counts
+        swept : int
+            A bitboard of where the user has swept a tile
+        flagged : int
+            A bitboard of where the user has flagged a tile
+        grid : list of lists
+            The state of the gameboard, rebuilt from the bitboards on access
         won : Boolean
             Whether the user has won
         lost : Boolean
@@ -51,23 +115,41 @@ class MineClicker:
         cli_take_action():
             A built in function for taking a turn
             using a command line interface
+        grid:
+            Rebuild the gameboard from the bitboards
         player_view():
             Return a suitably masked grid for the player
+        _render(grid):
+            Format a grid as text for the command line interface
         parse_coords(user_string):
             Parses a user submitted string
             into a tuple that can be used to index arrays
+        _parse_command(user_string):
+            Split a cli command into the action and its location
         flag_tile(location):
             Flag a possible mine
         clear_swept_flags():
             Clear flags on swept tiles
         sweep_tile(location):
             Wweep a tile (it could be a mine!)
+        flood_reveal(location):
+            Return the tiles revealed by sweeping a location
         sum_adjacent_mines(location):
             Return how many mines are in the 8 adjacent tiles
+        sum_adjacent_mines_all():
+            Return how many mines are adjacent to every tile
         valid_location(location):
             Test if a location is valid, used to sanitise inputs
+        _coords(location):
+            Convert a location into a tuple of python ints
+        _tile(location):
+            Return the bit number of the tile at location
+        _bit(location):
+            Return the bitboard with only the tile at location set
+        _rows(tiles):
+            Split a list of every tile into the rows of the gameboard
         check_game_state():
-            Change the won/lost flags based on the grid
+            Change the won/lost flags based on the bitboards
         exit_game():
             Function for indicating the user wants to leave the game
     More documentation can be found in the docstring for each function and
@@ -98,36 +180,91 @@ class MineClicker:
         self.exploded = 11
         self.flag = 12
 
-        # numpy arrays are accessed [row, col] where [0,0] is the top left of
-        # the array (when printed):
-        # [[(0,0), (0,1)]
-        #  [(1,0), (1,1)]]
+        # the board is stored as 64 bit integers (bitboards) with one bit per
+        # tile, incrementing left to right, top to bottom so that (0,0) is the
+        # top left of the board and the lowest bit:
+        # [[0,  1,  2, ...  7]
+        #  [8,  9, 10, ... 15]
         self.rows = 8
         self.cols = 8
-        self.grid = np.zeros([self.rows, self.cols], dtype=int)
-        self.grid.fill(self.unexplored)
+        mines = 0
 
-        # arrays for flags, should be seperate from actual game state
-        self.flagged = np.zeros([self.rows, self.cols], dtype=int)
-        self.swept = np.zeros([self.rows, self.cols], dtype=int)
+        # bitboards for player actions, should be seperate from the mines
+        self.flagged = 0
+        self.swept = 0
 
         if locations is None:
             self.number_of_mines = 10
-            # it is easy to sample for locations in a range, which we then turn
-            # int a grid location by incrementing left to right, top to bottom:
-            # [[0, 1, 2, 3]
-            #  [4, 5, 6, 7]
+            # it is easy to sample for locations in a range, which are already
+            # the bit numbers of the tiles on the bitboard
             mine_locations_flat = rand.sample(range(self.rows*self.cols),
                                               self.number_of_mines)
             for location in mine_locations_flat:
-                location = divmod(location, self.cols)
-                self.grid[location] = self.mine
+                mines |= 1 << location
         else:
             self.number_of_mines = 0
             for location in locations:
                 if self.valid_location(location):
-                    self.grid[location] = self.mine
+                    mines |= self._bit(location)
                     self.number_of_mines += 1
+        # set the mines in one go, so the adjacent counts are only built once
+        self.mines = mines
+
+        # the cli prompt doesn't change during a game so only build it once
+        self._prompt = (
+            ".: unexplored, F: player flag\n\n" +
+            "0 0 is top left\n" +
+            f"there are {self.number_of_mines} mines in the grid\n" +
+            "to sweep a tile, enter the coordinates $row $col like 3 4\n" +
+            "to flag/unflag a tile, enter f$row $col like f3 4\n" +
+            "to quit to menu, enter q\n"
+            )
+
+    @property
+    def mines(self):
+        """
+        The bitboard of where the mines are on the gameboard. Setting it also
+        rebuilds the adjacent mine counts, which are worked out up front as
+        the mines usually don't move during a game.
+        Returns
+        -------
+        int
+            A bitboard of the mines
+        """
+        return self._mines
+
+    @mines.setter
+    def mines(self, mines):
+        self._mines = mines
+        self._adj_counts = bytes((neighbours & mines).bit_count()
+                                 for neighbours in NEIGHBOURS)
+        # the tiles with no adjacent mines, which flood_reveal() spreads from
+        self._empty = ~(mines | adjacent_tiles(mines)) & FULL_BOARD
+
+    @property
+    def grid(self):
+        """
+        The gameboard rebuilt from the bitboards. Swept tiles show the number
+        of adjacent mines (or a detonated mine), unswept tiles show as
+        unexplored or as a mine.
+        Returns
+        -------
+        list of lists
+            The rows of the gameboard, accessed like grid[row][col]
+        """
+        tiles = []
+        for tile in range(self.rows*self.cols):
+            bit = 1 << tile
+            if self.swept & bit:
+                if self.mines & bit:
+                    tiles.append(self.exploded)
+                else:
+                    tiles.append(self._adj_counts[tile])
+            elif self.mines & bit:
+                tiles.append(self.mine)
+            else:
+                tiles.append(self.unexplored)
+        return self._rows(tiles)
 
     def cli_take_action(self):
         """
@@ -137,39 +274,27 @@ class MineClicker:
         useful information, prompting the user for action
         and letting them know if they have won or lost the game.
         """
-        print("\n" + f"{self.player_view()}" + "\n")
-        user_string = input(
-            f"{np.nan}: unexplored, {self.flag}: player flag\n\n" +
-            "0 0 is top left\n" +
-            f"there are {self.number_of_mines} mines in the grid\n" +
-            "to sweep a tile, enter the coordinates $row $col like 3 4\n" +
-            "to flag/unflag a tile, enter f$row $col like f3 4\n" +
-            "to quit to menu, enter q\n"
-            )
+        print("\n" + self._render(self.player_view()) + "\n")
+        user_string = input(self._prompt)
 
-        if user_string == "q":
+        command, location = self._parse_command(user_string)
+        if command == "q":
             self.exit_game()
+        elif location is None:
+            print("\n!!!No action taken " +
+                  "as your command was not understood!!!")
+            return
         else:
-            location = self.parse_coords(user_string.strip("f"))
-            if location is not None:
-                if "f" in user_string:
-                    self.flag_tile(location)
-                else:
-                    self.sweep_tile(location)
-                self.clear_swept_flags()
-            if location is None:
-                print("\n!!!No action taken " +
-                      "as your command was not understood!!!")
-                return
+            if command == "f":
+                self.flag_tile(location)
+            else:
+                self.sweep_tile(location)
+            self.clear_swept_flags()
 
         if (self.won or self.lost):
-            endgame = np.zeros((self.rows, self.cols))
-            endgame[:] = self.grid[:]
-            endgame[np.where(endgame == self.unexplored)] = np.nan
             print(
-                f"\n{endgame}\n" +
-                f"{np.nan}: unexplored, " +
-                f"{self.mine}: mine, {self.exploded}: detonated mine!"
+                f"\n{self._render(self.grid)}\n" +
+                "\n.: unexplored, *: mine, X: detonated mine!"
                   )
 
     def player_view(self):
@@ -178,24 +303,44 @@ class MineClicker:
         which means indicating flagged tiles and masking mines.
         Returns
         -------
-        numpy.ndarray
-            An array that represents the gameboard the player should be
-            able to see.
+        list of lists
+            The rows of the gameboard the player should be able to see,
+            with nan for tiles they can't see
         """
-        view = np.zeros([self.rows, self.cols])
-        view[:] = self.grid[:]
-
-        mine_mask = np.where(self.grid == self.mine)
-        view[mine_mask] = np.nan
-
-        unexplored_mask = np.where(self.grid == self.unexplored)
-        view[unexplored_mask] = np.nan
-
-        flag_mask = np.where(self.flagged == 1)
-        view[flag_mask] = self.flag
-
+        # the player can only see tiles they have swept (mines and unexplored
+        # are masked with nan) and their flags, which are shown over the top
+        view = self.grid
+        for row in range(self.rows):
+            for col in range(self.cols):
+                bit = 1 << (row*self.cols + col)
+                if self.flagged & bit:
+                    view[row][col] = self.flag
+                elif not self.swept & bit:
+                    view[row][col] = math.nan
         return view
 
+    def _render(self, grid):
+        """
+        Format a gameboard as text to print in the command line interface,
+        with a symbol for each tile that isn't a number of adjacent mines.
+        Paramaters.
+        ----------
+        grid : list of lists
+            A gameboard like grid or the result of player_view()
+        Returns
+        -------
+        string
+            The gameboard with a line for each row
+        """
+        symbols = {self.unexplored: ".",
+                   self.mine: "*",
+                   self.exploded: "X",
+                   self.flag: "F"}
+        return "\n".join(
+            " ".join("." if math.isnan(tile) else symbols.get(tile, str(tile))
+                     for tile in row)
+            for row in grid)
+
     def parse_coords(self, user_string):
         """
         Paramaters.
@@ -209,20 +354,39 @@ class MineClicker:
         None
             Returns None if the location can't be parsed
         """
-        parsing = user_string.split(' ')
-        if len(parsing) != 2:
+        row, _, col = user_string.partition(' ')
+        # negative numbers aren't on the gameboard, so only plain digits are
+        # worth converting (this also rejects a missing or extra coordinate)
+        if not (row.isdecimal() and col.isdecimal()):
             return None
-        try:
-            row = int(parsing[0])
-            col = int(parsing[1])
-            location = (row, col)
-            if self.valid_location(location):
-                return location
-            else:
-                return None
-        except Exception:
+        location = (int(row), int(col))
+        if self.valid_location(location):
+            return location
+        else:
             return None
 
+    def _parse_command(self, user_string):
+        """
+        Work out what a user typed in to the command line interface,
+        in a single pass over the string.
+        Paramaters.
+        ----------
+        user_string : string
+            A command like "q", "f2 2" or "2 2"
+        Returns
+        -------
+        tuple
+            The command, "q" to quit, "f" to flag or "s" to sweep, and the
+            location it applies to, which is None for quit or if the
+            location can't be parsed
+        """
+        command = user_string.strip()
+        if command == "q":
+            return ("q", None)
+        if command.startswith("f"):
+            return ("f", self.parse_coords(command[1:].lstrip()))
+        return ("s", self.parse_coords(command))
+
     def flag_tile(self, location):
         """
         Allows the user to flag a tile on the gameboard. This
@@ -233,7 +397,7 @@ class MineClicker:
         location : tuple
             A location in the grid formatted like (2,2)
         """
-        self.flagged[location] = not self.flagged[location]
+        self.flagged ^= self._bit(location)
 
     def clear_swept_flags(self):
         """
@@ -241,7 +405,7 @@ class MineClicker:
         user to be able to flag a swept location, or you want the flag
         automatically removed on sweep. Alters the flagged data structure.
         """
-        self.flagged[np.where(self.swept)] = 0
+        self.flagged &= ~self.swept
 
     def sweep_tile(self, location):
         """
@@ -249,25 +413,52 @@ class MineClicker:
             - denotate a mine
             - or if the location is not mined, ti will update the gameboard
               with the number of mines adjacent to the swept location.
+            - and if there are no adjacent mines, sweep the surrounding
+              area too (see flood_reveal()).
         Triggers the check_game_state() function which updates the game state
-        if the sweep action caused victory or defeat. Alters the swept and grid
-        data structures.
+        if the sweep action caused victory or defeat. Alters the swept
+        data structure.
         Paramaters.
         ----------
         location : tuple
             A location in the grid formatted like (2,2)
         """
-        self.swept[location] = 1
-        if self.grid[location] == self.mine:
-            self.grid[location] = self.exploded
-        else:
-            self.grid[location] = self.sum_adjacent_mines(location)
+        self.swept |= self.flood_reveal(location)
         self.check_game_state()
 
+    def flood_reveal(self, location):
+        """
+        Find the tiles that are revealed by sweeping a location. Like in
+        minesweeper, if the location has no adjacent mines then all of its
+        neighbours are revealed as well, and this repeats for any of those
+        neighbours that also have no adjacent mines. Flagged tiles are never
+        revealed by the spread, only by sweeping them directly.
+        Paramaters.
+        ----------
+        location : tuple
+            A location in the grid formatted like (2,2)
+        Returns
+        -------
+        int
+            A bitboard of the tiles revealed, which is just location if it
+            is a mine or has adjacent mines
+        """
+        # the reveal only spreads from tiles with no adjacent mines, and
+        # stops at the player's flags
+        revealed = self._bit(location)
+        unflagged = ~self.flagged
+        while True:
+            spread = (revealed |
+                      (adjacent_tiles(revealed & self._empty) & unflagged))
+            if spread == revealed:
+                return revealed
+            revealed = spread
+
     def sum_adjacent_mines(self, location):
         """
         Return the number of undetonated mines adjacent to a location on
-        the gameboard.
+        the gameboard. Locations just off the gameboard count the mines on
+        the gameboard next to them.
         Paramaters.
         ----------
         location : tuple
@@ -276,22 +467,42 @@ class MineClicker:
         -------
         int
             Number of mines adjacent (inlcuding diagonals) to location
+        Raises
+        ------
+        ValueError
+            If location isn't a pair of integers
         """
-        adjacent_mines = 0
-        [row, col] = location
-        adjacent_locations = [(row+1, col),
-                              (row-1, col),
-                              (row, col+1),
-                              (row, col-1),
-                              (row+1, col+1),
-                              (row+1, col-1),
-                              (row-1, col+1),
-                              (row-1, col-1)]
-        for location in adjacent_locations:
-            if self.valid_location(location):
-                if self.grid[location] == self.mine:
-                    adjacent_mines += 1
-        return adjacent_mines
+        if self.valid_location(location):
+            return (NEIGHBOURS[self._tile(location)] & self.mines).bit_count()
+
+        # off the gameboard there's no lookup, so find the neighbours that
+        # are on it
+        coords = self._coords(location)
+        if coords is None:
+            raise ValueError(f"{location} is not a location")
+        [row, col] = coords
+        adjacent = 0
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                neighbour = (row + d_row, col + d_col)
+                if (d_row or d_col) and self.valid_location(neighbour):
+                    adjacent |= self._bit(neighbour)
+        return (adjacent & self.mines).bit_count()
+
+    def sum_adjacent_mines_all(self):
+        """
+        Return the number of undetonated mines adjacent to every location on
+        the gameboard. Useful for solvers, which want the counts for the
+        whole gameboard rather than one location at a time.
+        Returns
+        -------
+        list of lists
+            The number of mines adjacent (inlcuding diagonals) to each
+            location, accessed like counts[row][col]
+        """
+        counts = [(neighbours & self.mines).bit_count()
+                  for neighbours in NEIGHBOURS]
+        return self._rows(counts)
 
     def valid_location(self, location):
         """
@@ -300,21 +511,96 @@ class MineClicker:
         Paramaters.
         ----------
         location : tuple
-            A location in the grid formatted like (2,2)
+            A location in the grid formatted like (2,2), any other pair of
+            integers like [2,2] or a numpy array also works
         Returns
         -------
         boolean
             True if location is valid and False if it is not
         """
+        coords = self._coords(location)
+        if coords is None:
+            return False
+        [row, col] = coords
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def _coords(self, location):
+        """
+        Convert a location into a tuple of python ints, without checking it
+        lies on the gameboard.
+        Paramaters.
+        ----------
+        location : tuple
+            A location in the grid formatted like (2,2)
+        Returns
+        -------
+        tuple
+            The location as python ints, like (2, 2)
+        None
+            Returns None if location isn't a pair of integers
+        """
         try:
+            if len(location) != 2:
+                return None
             [row, col] = location
-        except Exception:
-            return False
-        if ((row >= self.rows) or (row < 0) or
-                (col >= self.cols) or (col < 0)):
-            return False
-        else:
-            return True
+            return (operator.index(row), operator.index(col))
+        except TypeError:
+            return None
+
+    def _tile(self, location):
+        """
+        Return the bit number of a tile on the gameboard.
+        Paramaters.
+        ----------
+        location : tuple
+            A location in the grid formatted like (2,2)
+        Returns
+        -------
+        int
+            The bit number, row*8 + col, of location
+        Raises
+        ------
+        IndexError
+            If location is not on the gameboard
+        """
+        if not self.valid_location(location):
+            raise IndexError(f"{location} is not on the gameboard")
+        [row, col] = self._coords(location)
+        return row*self.cols + col
+
+    def _bit(self, location):
+        """
+        Return the bitboard for a single tile on the gameboard.
+        Paramaters.
+        ----------
+        location : tuple
+            A location in the grid formatted like (2,2)
+        Returns
+        -------
+        int
+            A bitboard with only the bit for location set
+        Raises
+        ------
+        IndexError
+            If location is not on the gameboard
+        """
+        return 1 << self._tile(location)
+
+    def _rows(self, tiles):
+        """
+        Split a list of every tile on the gameboard, in bit number order, into
+        the rows of the gameboard.
+        Paramaters.
+        ----------
+        tiles : list
+            A value for each of the 64 tiles
+        Returns
+        -------
+        list of lists
+            The tiles accessed like tiles[row][col]
+        """
+        return [tiles[row*self.cols:(row + 1)*self.cols]
+                for row in range(self.rows)]
 
     def check_game_state(self):
         """
@@ -323,9 +609,9 @@ class MineClicker:
         every tile that is not a mine. They lose if they detonate
         (sweep) a mine.
         """
-        if self.exploded in self.grid:
+        if self.swept & self.mines:
             self.lost = True
-        elif not (self.grid == self.unexplored).any():
+        elif (self.swept | self.mines) == FULL_BOARD:
             self.won = True
 
     def exit_game(self):
@@ -2,7 +2,18 @@ import pytest
 import numpy as np
 
 
-from mineclicker.lib import MineClicker
+from mineclicker.lib import MineClicker, NEIGHBOURS, to_numpy
+
+
+def to_bitboard(locations):
+    """
+    A helper which turns a list of locations into the bitboard
+    used by MineClicker to store the gameboard
+    """
+    bitboard = 0
+    for [row, col] in locations:
+        bitboard |= 1 << (row*8 + col)
+    return bitboard
 
 
 def test_setup_default_game():
@@ -12,7 +23,7 @@ def test_setup_default_game():
     default behaviours
     """
     game = MineClicker()
-    no_of_mines = np.sum(game.grid == game.mine, axis=(0, 1))
+    no_of_mines = game.mines.bit_count()
     assert no_of_mines == 10
     assert game.number_of_mines == no_of_mines
 
@@ -26,17 +37,18 @@ def test_setup_game_with_mines():
     locations = [(0, 1),
                  (4, 5),
                  (6, 2),
-                 (0, 4),
+                 [0, 4],  # lists work too, like locations loaded from json
+                 (np.int64(3), np.int64(3)),  # numpy ints are fine too
+                 np.array([3, 5]),  # and arrays, like from np.argwhere
                  (-1, -1),
                  "waffles"]
     game = MineClicker(locations)
-    assert game.grid.shape == (8, 8)
-    no_of_mines = np.sum(game.grid == game.mine, axis=(0, 1))
-    assert no_of_mines == 4  # only 4 of the locations are valid
-    assert game.number_of_mines == no_of_mines
-    for location in locations[:-1]:
-        if location != (-1, -1):
-            assert game.grid[location] == game.mine
+    assert to_numpy(game.grid).shape == (8, 8)
+    assert game.mines == to_bitboard(locations[:6])
+    # only 6 of the locations are valid
+    assert game.number_of_mines == game.mines.bit_count() == 6
+    for [row, col] in locations[:6]:
+        assert game.grid[row][col] == game.mine
 
 
 testdata = [("1 1", (1, 1)),
@@ -47,6 +59,7 @@ testdata = [("1 1", (1, 1)),
             ("9 0", None),
             ("90", None),
             ("fsdaf", None),
+            ("1 a", None),
             ("1 2 3", None)]
 @pytest.mark.parametrize("coord, expected", testdata)
 def test_parse_coords(coord, expected):
@@ -57,15 +70,39 @@ def test_parse_coords(coord, expected):
     game = MineClicker()
     assert game.parse_coords(coord) == expected
 
+testdata = [("q", ("q", None)),
+            (" q\n", ("q", None)),
+            ("3 4", ("s", (3, 4))),
+            ("f3 4", ("f", (3, 4))),
+            ("f 3 4", ("f", (3, 4))),
+            ("f9 4", ("f", None)),
+            ("3 4 5", ("s", None)),
+            ("quit", ("s", None))]
+@pytest.mark.parametrize("command, expected", testdata)
+def test_parse_command(command, expected):
+    """
+    This test checks that cli commands are split into the right
+    action and location by submitting a set of representative inputs
+    """
+    game = MineClicker()
+    assert game._parse_command(command) == expected
+
 testdata = [((1, 1), True),
             ((7, 4), True),
+            ([7, 4], True),
+            ((np.int64(7), np.int64(4)), True),
+            (np.array([7, 4]), True),
+            (np.array([7, 4, 1]), False),
+            ((1.0, 2.0), False),
             ((0, 9), False),
             ((9, 0), False),
             ((-1, 0), False),
             ((0, -1), False),
             (90, False),
             ("fsdaf", False),
-            ("1 2", False)]
+            ("1 2", False),
+            ((1, 2, 3), False),
+            ([1, 2, 3], False)]
 @pytest.mark.parametrize("location, expected", testdata)
 def test_valid_location(location, expected):
     """
@@ -87,27 +124,30 @@ def test_flagging():
     location = (1, 2)
     game.flag_tile(location)
     game.clear_swept_flags()
-    assert game.flagged[location] == 1
-    assert np.sum(game.flagged, axis=(0, 1)) == 1
+    assert game.flagged == to_bitboard([location])
 
     game.flag_tile(location)
-    assert game.flagged[location] == 0
-    assert np.sum(game.flagged, axis=(0, 1)) == 0
+    assert game.flagged == 0
 
     game.sweep_tile(location)
     game.flag_tile(location)
     game.clear_swept_flags()
-    assert game.flagged[location] == 0
+    assert not game.flagged & to_bitboard([location])
 
     location = (2, 1)
     game.flag_tile(location)
     game.sweep_tile(location)
     game.clear_swept_flags()
-    assert game.flagged[location] == 0
+    assert not game.flagged & to_bitboard([location])
 
     with pytest.raises(Exception):
         game.flag_tile((8, 8))
 
+    # numpy integers must not turn the bitboard into a numpy scalar
+    game.flag_tile((np.int64(7), np.int64(7)))
+    assert type(game.flagged) is int
+    assert game.flagged & to_bitboard([(7, 7)])
+
 
 def test_player_view():
     """
@@ -116,21 +156,22 @@ def test_player_view():
     scenario and testing that the player can see their flags
     and can't see unexploded mines!"""
     game = MineClicker([(7, 7)])
-    assert game.grid[(7, 7)] == game.mine
+    assert game.grid[7][7] == game.mine
 
     game.flag_tile((0, 0))
-    view = game.player_view()
+    view = to_numpy(game.player_view())
     assert view[(0, 0)] == game.flag
     assert np.isnan(view[(7, 7)])
+    assert np.isnan(view).sum() == 63
 
     game.flag_tile((7, 7))
     view = game.player_view()
-    assert view[(7, 7)] == game.flag
+    assert view[7][7] == game.flag
 
     game.sweep_tile((7, 7))
     game.clear_swept_flags()
     view = game.player_view()
-    assert view[(7, 7)] == game.exploded
+    assert view[7][7] == game.exploded
     assert game.lost is True
 
 
@@ -138,18 +179,10 @@ def test_sweep_tile():
     """
     This tests checks the sweep_tile functionality by sweeping
     some tiles on a known gameboard. It also implicity tests
-    sum_adjacent_mines quite extensively, so right now that
-    function doesn't have its own unit test.
-    """
-    grid = [[9, 9, 9, 9, 9, 9, 9, 9],
-            [9, 9, 9, 9, 9, 9, 10, 9],
-            [9, 9, 9, 9, 9, 9, 9, 9],
-            [9, 10, 9, 9, 9, 9, 9, 9],
-            [9, 9, 9, 9, 9, 9, 9, 9],
-            [9, 10, 9, 9, 9, 9, 9, 9],
-            [9, 9, 9, 9, 9, 9, 9, 9],
-            [9, 9, 9, 9, 9, 9, 9, 9]]
-    grid = np.array(grid)
+    sum_adjacent_mines quite extensively.
+    """
+    # bits 14, 25 and 41 (row*8 + col) for the locations below
+    mines = 0x0000020002004000
 
     locations = [(1, 6),
                  (3, 1),
@@ -157,7 +190,8 @@ def test_sweep_tile():
 
     game = MineClicker(locations)
     # another test of the class initialisation
-    assert np.array_equal(grid, game.grid)
+    assert game.mines == mines
+    assert game.swept == 0
     sweep_circle = [(0, 5),
                     (0, 6),
                     (0, 7),
@@ -169,9 +203,9 @@ def test_sweep_tile():
 
     for location in sweep_circle:
         game.sweep_tile(location)
-        assert game.grid[location] == 1
+        assert game.grid[location[0]][location[1]] == 1
     game.sweep_tile((4, 1))
-    assert game.grid[(4, 1)] == 2
+    assert game.grid[4][1] == 2
     assert game.lost is False
     assert game.won is False
     game.sweep_tile(locations[0])
@@ -179,37 +213,138 @@ def test_sweep_tile():
     assert game.won is False
 
 
+def test_flood_reveal():
+    """
+    This test checks that sweeping a tile with no adjacent mines
+    reveals the surrounding area, stopping at tiles next to mines
+    """
+    # a wall of mines down column 3 splits the board in two
+    mines = [(row, 3) for row in range(8)]
+    game = MineClicker(mines)
+    game.sweep_tile((0, 0))
+    left = [(row, col) for row in range(8) for col in range(3)]
+    assert game.swept == to_bitboard(left)
+    assert game.won is False
+
+    # sweeping next to the wall only reveals that one tile
+    game.sweep_tile((0, 4))
+    assert game.swept == to_bitboard(left + [(0, 4)])
+
+    # the reveal goes around flags rather than sweeping them, but a
+    # flagged tile can still be swept on purpose
+    game = MineClicker(mines)
+    game.flag_tile((0, 1))
+    game.sweep_tile((0, 0))
+    game.clear_swept_flags()
+    assert game.swept == to_bitboard(left) ^ to_bitboard([(0, 1)])
+    assert game.flagged == to_bitboard([(0, 1)])
+    game.sweep_tile((0, 1))
+    assert game.swept == to_bitboard(left)
+
+    # a single corner mine means one sweep clears the board
+    game = MineClicker([(7, 7)])
+    game.sweep_tile((0, 0))
+    assert game.swept == to_bitboard([(7, 7)]) ^ 0xFFFFFFFFFFFFFFFF
+    assert game.won is True
+    assert game.lost is False
+
+
+def test_neighbours():
+    """
+    This test checks the NEIGHBOURS lookup table against the
+    neighbours of each tile worked out by hand from its row and col
+    """
+    assert len(NEIGHBOURS) == 64
+    for row in range(8):
+        for col in range(8):
+            expected = [(row + d_row, col + d_col)
+                        for d_row in (-1, 0, 1) for d_col in (-1, 0, 1)
+                        if (d_row or d_col) and
+                        0 <= row + d_row < 8 and 0 <= col + d_col < 8]
+            assert NEIGHBOURS[row*8 + col] == to_bitboard(expected)
+
+
+testdata = [([(0, 0), (1, 0), (2, 0)], (1, 1), 3),
+            ([(0, 0), (1, 0), (2, 0)], (1, 7), 0),
+            ([(0, 7), (1, 7), (2, 7)], (1, 0), 0),
+            ([(6, 6), (6, 7), (7, 6), (7, 7)], (7, 7), 3),
+            ([(0, 0), (0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)],
+             (1, 1), 8),
+            # off the gameboard only the neighbours on it are counted
+            ([(0, 0), (0, 1)], (-1, 0), 2),
+            ([(0, 0), (0, 1)], (-1, -1), 1),
+            ([(7, 7)], (8, 8), 1),
+            ([(7, 7)], (9, 9), 0)]
+@pytest.mark.parametrize("mines, location, expected", testdata)
+def test_sum_adjacent_mines(mines, location, expected):
+    """
+    This test checks sum_adjacent_mines counts the mines around a
+    location, including at the edges of the gameboard where mines on
+    the other side of the board must not be counted
+    """
+    game = MineClicker(mines)
+    assert game.sum_adjacent_mines(location) == expected
+
+
+def test_sum_adjacent_mines_not_a_location():
+    """
+    This test checks sum_adjacent_mines refuses things that
+    aren't locations at all
+    """
+    game = MineClicker()
+    with pytest.raises(ValueError):
+        game.sum_adjacent_mines("waffles")
+
+
+def test_move_mines():
+    """
+    This test checks that setting the mines after the gameboard
+    is created keeps the adjacent mine counts up to date
+    """
+    game = MineClicker([(7, 7)])
+    game.mines = to_bitboard([(0, 1)])
+    game.sweep_tile((0, 0))
+    assert game.swept == to_bitboard([(0, 0)])
+    assert game.grid[0][0] == game.sum_adjacent_mines((0, 0)) == 1
+    assert game.lost is False
+
+
+def test_sum_adjacent_mines_all():
+    """
+    This test checks sum_adjacent_mines_all agrees with
+    sum_adjacent_mines for every location, on a crowded gameboard
+    and on some random ones
+    """
+    crowded = [(row, col) for row in range(8) for col in range(8)
+               if (row + col) % 3]
+    for game in [MineClicker(crowded)] + [MineClicker() for _ in range(5)]:
+        counts = to_numpy(game.sum_adjacent_mines_all())
+        assert counts.shape == (8, 8)
+        for row in range(8):
+            for col in range(8):
+                expected = game.sum_adjacent_mines((row, col))
+                assert counts[row, col] == expected
+
+
+board = [(row, col) for row in range(8) for col in range(8)]
 testdata = (
-            (
-             ([9, 11],
-              [10, 2]),
-             False, True
-            ),
-            (
-             ([10, 1],
-              [1, 1]),
-             True, False
-            ),
-            (
-             ([9, 1],
-              [10, 1]),
-             False, False
-            ),
-            (
-             ([1, 1],
-              [1, 11]),
-             False, True
-            )
+            ([(0, 1), (1, 0)], [(0, 1), (1, 1)], False, True),
+            ([(0, 0)], board[1:], True, False),
+            ([(1, 0)], [(0, 1), (1, 1)], False, False),
+            ([(1, 1)], board, False, True)
             )
-@pytest.mark.parametrize("grid, won, lost", testdata)
-def test_check_game_state(grid, won, lost):
+# build the swept bitboards once when the tests are collected
+testdata = [(mines, to_bitboard(swept), won, lost)
+            for (mines, swept, won, lost) in testdata]
+@pytest.mark.parametrize("mines, swept, won, lost", testdata)
+def test_check_game_state(mines, swept, won, lost):
     """
     This test checks check_game_state by verifying the the won/lost flags
-    that check_game_state controls using minature gameboards of known win/loss
+    that check_game_state controls using gameboards of known win/loss
     condition
     """
-    game = MineClicker()
-    game.grid = np.array(grid)
+    game = MineClicker(mines)
+    game.swept = swept
     game.check_game_state()
     assert game.won is won
     assert game.lost is lost